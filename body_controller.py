@@ -1,5 +1,20 @@
+import logging
 import time
 import json
+from array import array
+from collections.abc import Mapping
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+# Trace of simulated actions; route this logger to its own handler to capture simulation runs
+sim_logger = logging.getLogger(__name__ + ".sim")
+
+# Number of most recent actions retained in the action history
+ACTION_HISTORY_SIZE = 1024
+# Known action types; these are stored as small integer ids in the action history
+ACTION_TYPES = ("speak", "move", "display_visual", "express_emotion")
+# Shared, read-only default for perform_action's parameters
+_NO_PARAMETERS = MappingProxyType({})
 
 class BodyController:
     """
@@ -7,100 +22,155 @@ class BodyController:
     or external actuators. This class translates AI decisions into actionable outputs.
     """
 
-    def __init__(self, simulation_mode: bool = True):
+    __slots__ = (
+        "_simulation_mode", "_log_tag", "_action_logger", "_emit_action", "_handlers", "last_action_time",
+        "_hist_size", "_hist_ts", "_hist_type", "_hist_details", "_hist_idx",
+        "_action_type_names", "_action_type_ids",
+    )
+
+    def __init__(self, simulation_mode: bool = True, history_size: int = ACTION_HISTORY_SIZE):
         """
         Initializes the BodyController.
 
         Args:
             simulation_mode (bool): If True, operations are simulated (e.g., print statements).
                                     If False, it would attempt to connect to real hardware/APIs.
+            history_size (int): The number of most recent actions kept in the action history.
         """
-        self.simulation_mode = simulation_mode
+        if history_size <= 0:
+            logger.warning("history_size should be a positive integer. Setting to default %d.", ACTION_HISTORY_SIZE)
+            history_size = ACTION_HISTORY_SIZE
+
+        self.simulation_mode = simulation_mode # Also selects the mode-specific logging path
         self.last_action_time = time.time()
-        self.action_history = [] # To log simulated actions
 
-        print(f"BodyController initialized. Simulation Mode: {self.simulation_mode}")
+        # Action history is a fixed-size ring buffer stored as parallel arrays (timestamps and
+        # type ids are plain numeric arrays), so memory use stays bounded for long-running agents.
+        self._hist_size = history_size
+        self._hist_ts = array('q', bytes(8 * history_size))
+        self._hist_type = array('h', bytes(2 * history_size))
+        self._hist_details = [None] * history_size
+        self._hist_idx = 0
+        self._action_type_names = list(ACTION_TYPES)
+        self._action_type_ids = {name: i for i, name in enumerate(ACTION_TYPES)}
+
+        # Dispatch table for perform_action
+        self._handlers = {
+            "speak": self._do_speak,
+            "move": self._do_move,
+            "display_visual": self._do_display,
+            "express_emotion": self._do_emotion,
+        }
+
+        logger.info("BodyController initialized. Simulation Mode: %s", self.simulation_mode)
+
+    @property
+    def simulation_mode(self) -> bool:
+        """If True, actions are simulated rather than sent to real hardware/APIs."""
+        return self._simulation_mode
+
+    @simulation_mode.setter
+    def simulation_mode(self, simulation_mode: bool):
+        # Specialize once per mode instead of branching on it for every action
+        self._simulation_mode = simulation_mode
+        self._log_tag = "SIM" if simulation_mode else "REAL"
+        self._action_logger = sim_logger if simulation_mode else logger
+        self._emit_action = self._log_action if simulation_mode else self._log_real_action
 
     def _log_action(self, action_type: str, details: dict):
         """Logs a simulated or real action."""
-        log_entry = {
-            "timestamp": time.time(),
-            "action_type": action_type,
-            "details": details
-        }
-        self.action_history.append(log_entry)
-        if self.simulation_mode:
-            print(f"[BodyController - SIM] Action: {action_type}, Details: {details}")
-        else:
-            # In a real scenario, this would log to a persistent file or monitoring system
-            print(f"[BodyController - REAL] Action: {action_type}, Details: {details}")
-
-    def perform_action(self, action_type: str, parameters: dict = None) -> bool:
+        type_id = self._action_type_ids.get(action_type)
+        if type_id is None:
+            type_id = self._action_type_ids[action_type] = len(self._action_type_names)
+            self._action_type_names.append(action_type)
+
+        i = self._hist_idx % self._hist_size
+        self._hist_ts[i] = time.monotonic_ns()
+        self._hist_type[i] = type_id
+        self._hist_details[i] = details
+        self._hist_idx += 1
+        # In a real scenario, REAL actions would log to a persistent file or monitoring system
+        self._action_logger.debug("[BodyController - %s] Action: %s, Details: %s", self._log_tag, action_type, details)
+
+    def _log_real_action(self, action_type: str, details: dict):
+        """Logs an action that was attempted against real hardware/APIs."""
+        details["status"] = "attempted_real"
+        self._log_action(action_type, details)
+
+    def perform_action(self, action_type: str, parameters: Mapping | None = _NO_PARAMETERS) -> bool:
         """
         Performs a specified action.
 
         Args:
             action_type (str): The type of action to perform (e.g., "speak", "move", "display_image").
-            parameters (dict): A dictionary of parameters relevant to the action.
+            parameters (Mapping | None): A dictionary of parameters relevant to the action.
+                                         Omit it (or pass None) to use the defaults; handlers only read from it.
 
         Returns:
             bool: True if the action was successfully initiated, False otherwise.
         """
-        parameters = parameters if parameters is not None else {}
         self.last_action_time = time.time()
 
-        if action_type == "speak":
-            text_to_speak = parameters.get("text", "Hello, I am Presence AI.")
-            if self.simulation_mode:
-                self._log_action("speak", {"text": text_to_speak})
-                # In a real system: call text-to-speech API or hardware
-            else:
-                # Placeholder for real TTS integration
-                # Example: tts_engine.speak(text_to_speak)
-                self._log_action("speak", {"text": text_to_speak, "status": "attempted_real"})
-            return True
-        elif action_type == "move":
-            direction = parameters.get("direction", "forward")
-            distance = parameters.get("distance", 1.0)
-            if self.simulation_mode:
-                self._log_action("move", {"direction": direction, "distance": distance})
-                # In a real system: send commands to robot motors
-            else:
-                # Placeholder for real robotics integration
-                # Example: robot_api.move(direction, distance)
-                self._log_action("move", {"direction": direction, "distance": distance, "status": "attempted_real"})
-            return True
-        elif action_type == "display_visual":
-            content_type = parameters.get("content_type", "text") # "text", "image_url", "emoji"
-            content = parameters.get("content", "No content.")
-            if self.simulation_mode:
-                self._log_action("display_visual", {"content_type": content_type, "content": content})
-                # In a real system: update a display screen
-            else:
-                # Placeholder for real display integration
-                # Example: display_api.show(content_type, content)
-                self._log_action("display_visual", {"content_type": content_type, "content": content, "status": "attempted_real"})
-            return True
-        elif action_type == "express_emotion":
-            emotion = parameters.get("emotion", "neutral")
-            intensity = parameters.get("intensity", 0.5) # 0.0 to 1.0
-            if self.simulation_mode:
-                self._log_action("express_emotion", {"emotion": emotion, "intensity": intensity})
-                # In a real system: change facial expression on avatar, adjust vocal tone
-            else:
-                # Placeholder for real emotional expression integration
-                self._log_action("express_emotion", {"emotion": emotion, "intensity": intensity, "status": "attempted_real"})
-            return True
-        else:
-            print(f"Warning: Unknown action type '{action_type}'.")
+        handler = self._handlers.get(action_type)
+        if handler is None:
+            logger.warning("Unknown action type '%s'.", action_type)
             return False
+        if parameters is None:
+            parameters = _NO_PARAMETERS
+        return handler(parameters)
+
+    def _do_speak(self, parameters: dict) -> bool:
+        text_to_speak = parameters.get("text", "Hello, I am Presence AI.")
+        # In a real system: call text-to-speech API or hardware
+        # Example: tts_engine.speak(text_to_speak)
+        self._emit_action("speak", {"text": text_to_speak})
+        return True
+
+    def _do_move(self, parameters: dict) -> bool:
+        direction = parameters.get("direction", "forward")
+        distance = parameters.get("distance", 1.0)
+        # In a real system: send commands to robot motors
+        # Example: robot_api.move(direction, distance)
+        self._emit_action("move", {"direction": direction, "distance": distance})
+        return True
+
+    def _do_display(self, parameters: dict) -> bool:
+        content_type = parameters.get("content_type", "text") # "text", "image_url", "emoji"
+        content = parameters.get("content", "No content.")
+        # In a real system: update a display screen
+        # Example: display_api.show(content_type, content)
+        self._emit_action("display_visual", {"content_type": content_type, "content": content})
+        return True
+
+    def _do_emotion(self, parameters: dict) -> bool:
+        emotion = parameters.get("emotion", "neutral")
+        intensity = parameters.get("intensity", 0.5) # 0.0 to 1.0
+        # In a real system: change facial expression on avatar, adjust vocal tone
+        self._emit_action("express_emotion", {"emotion": emotion, "intensity": intensity})
+        return True
+
+    def iter_action_history(self):
+        """
+        Lazily yields the retained actions, oldest first, as
+        {"timestamp", "action_type", "details"} dictionaries.
+        Timestamps are time.monotonic_ns() values: good for ordering and intervals, not wall-clock time.
+        """
+        count = min(self._hist_idx, self._hist_size)
+        for n in range(self._hist_idx - count, self._hist_idx):
+            i = n % self._hist_size
+            yield {
+                "timestamp": self._hist_ts[i],
+                "action_type": self._action_type_names[self._hist_type[i]],
+                "details": self._hist_details[i]
+            }
 
     def get_action_history(self) -> list:
-        """Returns the history of performed actions."""
-        return self.action_history
+        """Returns the history of performed actions (at most the last history_size entries)."""
+        return list(self.iter_action_history())
 
 # Example Usage (for testing purposes)
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     # Test in simulation mode
     print("\n--- Testing BodyController in Simulation Mode ---")
     sim_controller = BodyController(simulation_mode=True)
@@ -110,8 +180,9 @@ if __name__ == "__main__":
     sim_controller.perform_action("express_emotion", {"emotion": "joy", "intensity": 0.8})
     sim_controller.perform_action("unknown_action")
     print("\nSimulated Action History:")
-    for action in sim_controller.get_action_history():
-        print(f"  - {action['action_type']} at {datetime.fromtimestamp(action['timestamp']).strftime('%H:%M:%S')}: {action['details']}")
+    sim_history = sim_controller.get_action_history()
+    for action in sim_history:
+        print(f"  - {action['action_type']} at +{(action['timestamp'] - sim_history[0]['timestamp']) / 1e6:.3f} ms: {action['details']}")
 
     # Test in (conceptual) real mode
     print("\n--- Testing BodyController in (Conceptual) Real Mode ---")
@@ -119,5 +190,6 @@ if __name__ == "__main__":
     real_controller.perform_action("speak", {"text": "Initiating real-world speech."})
     real_controller.perform_action("move", {"direction": "forward", "distance": 2.0})
     print("\nReal Mode Action History (conceptual):")
-    for action in real_controller.get_action_history():
-        print(f"  - {action['action_type']} at {datetime.fromtimestamp(action['timestamp']).strftime('%H:%M:%S')}: {action['details']}")
+    real_history = real_controller.get_action_history()
+    for action in real_history:
+        print(f"  - {action['action_type']} at +{(action['timestamp'] - real_history[0]['timestamp']) / 1e6:.3f} ms: {action['details']}")
@@ -1,7 +1,10 @@
-import json
+import copy
+import functools
+import logging
 import os
 import time
 from datetime import datetime # Import datetime
+from types import MappingProxyType
 
 # Assuming other core components might be integrated or referenced here
 # from ere_core.soft_memory_map import SoftMemoryMap
@@ -9,8 +12,22 @@ from datetime import datetime # Import datetime
 # from mood_tracker import MoodTracker
 # from body_controller import BodyController
 
+import json_io
+from config.loader import load_config
+
 BRAINS_DIR = "brains"
-CONFIG_FILE = "config/config.json"
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=128)
+def _read_json_cached(filepath: str, mtime_ns: int) -> dict:
+    """
+    Reads and parses a JSON file. The file's modification time is part of the cache key,
+    so an edited file is transparently re-read on the next lookup.
+    The returned dict is shared between callers and must not be modified; copy it before handing it out.
+    """
+    with open(filepath, 'rb') as f:
+        return json_io.loads(f.read())
 
 class BrainArchitect:
     """
@@ -25,19 +42,12 @@ class BrainArchitect:
         """
         os.makedirs(BRAINS_DIR, exist_ok=True)
         self.loaded_brain_profile = None
-        print(f"BrainArchitect initialized. Brains directory: {BRAINS_DIR}")
+        self._profiles_memo = (None, []) # (brains dir mtime_ns, profile names)
+        logger.info("BrainArchitect initialized. Brains directory: %s", BRAINS_DIR)
 
-    def _load_config(self) -> dict:
-        """Loads configuration from config.json."""
-        try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"Error: {CONFIG_FILE} not found. Please ensure it exists.")
-            return {}
-        except json.JSONDecodeError:
-            print(f"Error: Could not decode JSON from {CONFIG_FILE}. Please check its format.")
-            return {}
+    def _load_config(self) -> MappingProxyType:
+        """Returns the shared, read-only configuration from config.json."""
+        return load_config()
 
     def create_brain_profile(self, profile_name: str, modules_config: dict, description: str = "") -> bool:
         """
@@ -53,12 +63,12 @@ class BrainArchitect:
             bool: True if the profile was created successfully, False otherwise.
         """
         if not profile_name.strip():
-            print("Error: Brain profile name cannot be empty.")
+            logger.error("Brain profile name cannot be empty.")
             return False
 
         profile_filepath = os.path.join(BRAINS_DIR, f"{profile_name}.json")
         if os.path.exists(profile_filepath):
-            print(f"Warning: Brain profile '{profile_name}' already exists. Overwriting.")
+            logger.warning("Brain profile '%s' already exists. Overwriting.", profile_name)
 
         brain_data = {
             "profile_name": profile_name,
@@ -68,17 +78,19 @@ class BrainArchitect:
         }
 
         try:
-            with open(profile_filepath, 'w') as f:
-                json.dump(brain_data, f, indent=4)
-            print(f"Brain profile '{profile_name}' created successfully at {profile_filepath}")
+            with open(profile_filepath, 'wb') as f:
+                f.write(json_io.dumps(brain_data, indent=True))
+            logger.info("Brain profile '%s' created successfully at %s", profile_name, profile_filepath)
             return True
         except IOError as e:
-            print(f"Error creating brain profile '{profile_name}': {e}")
+            logger.error("Error creating brain profile '%s': %s", profile_name, e)
             return False
 
     def load_brain_profile(self, profile_name: str) -> dict | None:
         """
         Loads an existing brain profile configuration.
+        Repeated loads of an unmodified profile are served from an in-process cache; each call
+        returns its own copy, so callers may modify it freely.
 
         Args:
             profile_name (str): The name of the brain profile to load.
@@ -87,20 +99,21 @@ class BrainArchitect:
             dict | None: The loaded brain profile configuration as a dictionary, or None if not found.
         """
         profile_filepath = os.path.join(BRAINS_DIR, f"{profile_name}.json")
-        if not os.path.exists(profile_filepath):
-            print(f"Error: Brain profile '{profile_name}' not found at {profile_filepath}.")
+        try:
+            mtime_ns = os.stat(profile_filepath).st_mtime_ns
+        except FileNotFoundError:
+            logger.error("Brain profile '%s' not found at %s.", profile_name, profile_filepath)
             return None
 
         try:
-            with open(profile_filepath, 'r') as f:
-                self.loaded_brain_profile = json.load(f)
-                print(f"Brain profile '{profile_name}' loaded successfully.")
-                return self.loaded_brain_profile
-        except json.JSONDecodeError as e:
-            print(f"Error decoding brain profile '{profile_name}': {e}")
+            self.loaded_brain_profile = copy.deepcopy(_read_json_cached(profile_filepath, mtime_ns))
+            logger.debug("Brain profile '%s' loaded successfully.", profile_name)
+            return self.loaded_brain_profile
+        except json_io.JSONDecodeError as e:
+            logger.error("Error decoding brain profile '%s': %s", profile_name, e)
             return None
         except IOError as e:
-            print(f"Error reading brain profile '{profile_name}': {e}")
+            logger.error("Error reading brain profile '%s': %s", profile_name, e)
             return None
 
     def get_loaded_profile_config(self) -> dict | None:
@@ -116,12 +129,15 @@ class BrainArchitect:
         Returns:
             list: A list of available brain profile names (without .json extension).
         """
-        profiles = []
-        for filename in os.listdir(BRAINS_DIR):
-            if filename.endswith(".json"):
-                profiles.append(os.path.splitext(filename)[0])
-        print(f"Available brain profiles: {profiles}")
-        return profiles
+        # The directory is only rescanned when its modification time changes
+        mtime_ns = os.stat(BRAINS_DIR).st_mtime_ns
+        memo_mtime_ns, profiles = self._profiles_memo
+        if mtime_ns != memo_mtime_ns:
+            with os.scandir(BRAINS_DIR) as entries:
+                profiles = [entry.name[:-5] for entry in entries
+                            if entry.name.endswith(".json") and entry.is_file(follow_symlinks=False)]
+            self._profiles_memo = (mtime_ns, profiles)
+        return list(profiles)
 
     def delete_brain_profile(self, profile_name: str) -> bool:
         """
@@ -135,23 +151,24 @@ class BrainArchitect:
         """
         profile_filepath = os.path.join(BRAINS_DIR, f"{profile_name}.json")
         if not os.path.exists(profile_filepath):
-            print(f"Error: Brain profile '{profile_name}' not found for deletion.")
+            logger.error("Brain profile '%s' not found for deletion.", profile_name)
             return False
         try:
             os.remove(profile_filepath)
-            print(f"Brain profile '{profile_name}' deleted successfully.")
+            logger.info("Brain profile '%s' deleted successfully.", profile_name)
             return True
         except OSError as e:
-            print(f"Error deleting brain profile '{profile_name}': {e}")
+            logger.error("Error deleting brain profile '%s': %s", profile_name, e)
             return False
 
 # Example Usage (for testing purposes)
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     architect = BrainArchitect()
 
     # 1. List initial profiles
     print("\n--- Listing initial profiles ---")
-    architect.list_available_profiles()
+    print("Available brain profiles:", architect.list_available_profiles())
 
     # 2. Create a new brain profile
     print("\n--- Creating 'Standard_AI' profile ---")
@@ -175,7 +192,7 @@ if __name__ == "__main__":
 
     # 4. List profiles again
     print("\n--- Listing profiles after creation ---")
-    architect.list_available_profiles()
+    print("Available brain profiles:", architect.list_available_profiles())
 
     # 5. Load a brain profile
     print("\n--- Loading 'Standard_AI' profile ---")
@@ -194,4 +211,4 @@ if __name__ == "__main__":
 
     # 8. List profiles one last time
     print("\n--- Listing profiles after deletion ---")
-    architect.list_available_profiles()
+    print("Available brain profiles:", architect.list_available_profiles())
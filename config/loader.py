@@ -0,0 +1,46 @@
+import functools
+import logging
+import os
+from pathlib import Path
+from types import MappingProxyType
+
+import json_io
+
+CONFIG_FILE = "config/config.json"
+
+logger = logging.getLogger(__name__)
+
+def _freeze(value):
+    """Returns a read-only copy of parsed JSON: objects become MappingProxyTypes and arrays tuples, recursively."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+@functools.lru_cache(maxsize=1)
+def _read_config(mtime_ns: int) -> MappingProxyType:
+    """
+    Reads and parses config.json. The file's modification time is the cache key, so an edited file
+    is re-read on the next lookup. Errors propagate and are not cached, so a fixed file is picked up.
+    """
+    return _freeze(json_io.loads(Path(CONFIG_FILE).read_bytes()))
+
+def load_config() -> MappingProxyType:
+    """
+    Returns the runtime configuration from config.json.
+    The file is only re-read when its modification time changes, so repeated calls cost a single
+    stat; every caller shares the same mapping, which is read-only at every level
+    (nested objects are MappingProxyTypes and arrays are tuples).
+
+    Returns:
+        MappingProxyType: The parsed configuration, or an empty mapping if the file
+                          is missing or is not valid JSON.
+    """
+    try:
+        return _read_config(os.stat(CONFIG_FILE).st_mtime_ns)
+    except FileNotFoundError:
+        logger.error("%s not found. Using default settings.", CONFIG_FILE)
+    except json_io.JSONDecodeError:
+        logger.error("Could not decode JSON from %s. Using default settings.", CONFIG_FILE)
+    return MappingProxyType({})
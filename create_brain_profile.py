@@ -1,7 +1,6 @@
 import json
 import os
 from datetime import datetime
-from brain_architect import BrainArchitect # Import the BrainArchitect class
 
 # This script is a utility to simplify the creation of brain profiles.
 # It leverages the functionality provided by BrainArchitect.
@@ -10,7 +9,6 @@ def main():
     """
     Main function to run the brain profile creation utility.
     """
-    architect = BrainArchitect()
     print("\n--- Create New Brain Profile ---")
 
     profile_name = input("Enter a unique name for the new brain profile: ").strip()
@@ -18,6 +16,10 @@ def main():
         print("Profile name cannot be empty. Exiting.")
         return
 
+    # Imported only once the input is known to be usable, so the early exit above stays cheap
+    from brain_architect import BRAINS_DIR, BrainArchitect
+    architect = BrainArchitect()
+
     description = input("Enter a brief description for this profile (optional): ").strip()
 
     print("\nNow, define the configuration for each module.")
@@ -79,7 +81,7 @@ def main():
     print("\n--- Creating Brain Profile ---")
     if architect.create_brain_profile(profile_name, modules_config, description):
         print(f"\nBrain profile '{profile_name}' created successfully!")
-        print(f"You can find it in the '{BrainArchitect.BRAINS_DIR}' directory.")
+        print(f"You can find it in the '{BRAINS_DIR}' directory.")
     else:
         print("\nFailed to create brain profile.")
 
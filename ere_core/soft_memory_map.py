@@ -1,11 +1,154 @@
-import numpy as np
-import json
+from __future__ import annotations
+
+import functools
+import logging
 import os
-from datetime import datetime
+import queue
+import re
+import threading
+import time
+import weakref
+
+import json_io
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; a single precompiled regex is used without it
+    ahocorasick = None
 
 # Define the path for the ERE weight log
 LOG_DIR = "logs"
 ERE_WEIGHT_LOG_FILE = os.path.join(LOG_DIR, "ere_weight_log.jsonl")
+# Binary record logs have a fixed record width, so there is one file per number of emotions
+ERE_WEIGHT_RECORD_FILE = os.path.join(LOG_DIR, "ere_weight_log.f32x{num_emotions}.bin")
+LOG_FORMATS = ("binary", "jsonl")
+# Bound on log entries waiting for the background writer; entries beyond it are dropped
+LOG_QUEUE_SIZE = 4096
+# Maximum number of queued entries the writer combines into one write call
+LOG_WRITE_BATCH = 64
+# Maps with at most this many emotions get a generated straight-line update kernel
+UNROLL_MAX_EMOTIONS = 8
+
+logger = logging.getLogger(__name__)
+
+# numpy is imported on first SoftMemoryMap construction (see _import_numpy), so importing this
+# module stays cheap for tools that never touch ERE weights.
+np = None
+
+# Keywords recognised by SoftMemoryMap.map_input_to_emotion, mapped to the emotion index they affect
+EMOTION_KEYWORDS = {
+    "happy": 0, "joy": 0,           # joy
+    "sad": 1, "unhappy": 1,         # sadness
+    "angry": 2, "frustrated": 2,    # anger
+    "scared": 3, "fear": 3,         # fear
+    "surprise": 4, "unexpected": 4, # surprise
+}
+EMOTION_KEYWORD_IMPACT = 0.2
+
+
+def _import_numpy():
+    """Imports numpy into this module's namespace on first use."""
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def _record_dtype(num_emotions: int):
+    """The on-disk record of the binary ERE weight log: int64 time_ns timestamp + float32 weights."""
+    return np.dtype([('ts', '<i8'), ('w', '<f4', (num_emotions,))])
+
+
+# Update kernels share the signature kernel(weights, emotional_input, retain, interaction_strength),
+# where retain is 1 - decay_rate: decay the weights, add the scaled emotional input and clip to [0, 1],
+# all in place.
+
+def _update_kernel(weights, emotional_input, retain, interaction_strength):
+    """
+    Single-pass update loop, meant to be compiled with numba. All arguments must be
+    float32 arrays / Python floats so a single specialization is reused.
+    """
+    for i in range(weights.shape[0]):
+        v = weights[i] * retain + emotional_input[i] * interaction_strength
+        weights[i] = 0.0 if v < 0.0 else (1.0 if v > 1.0 else v)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_jit_update_kernel():
+    """Returns _update_kernel compiled with numba, or None if numba is not installed."""
+    try:
+        import numba # optional, and slow to import, so only loaded when requested
+    except ImportError:
+        return None
+    return numba.njit(cache=True, fastmath=True)(_update_kernel)
+
+
+@functools.lru_cache(maxsize=None)
+def _make_unrolled_kernel(num_emotions: int):
+    """
+    Generates an update kernel specialized for a fixed number of emotions: straight-line
+    scalar code with no Python loop and no per-call NumPy dispatch.
+    """
+    lines = ["def kernel(w, ei, r, s):"]
+    lines += [f"    w[{i}] = min(1.0, max(0.0, w[{i}] * r + ei[{i}] * s))" for i in range(num_emotions)]
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["kernel"]
+
+
+def _build_keyword_matcher():
+    """
+    Builds a function that scans a lowercased string once and yields the emotion index of
+    every EMOTION_KEYWORDS occurrence, overlapping ones included (like the `in` checks it replaces).
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword, index in EMOTION_KEYWORDS.items():
+            automaton.add_word(keyword, index)
+        automaton.make_automaton()
+        return lambda text: (index for _, index in automaton.iter(text))
+    # The zero-width lookahead lets "happy" still match inside "unhappy"
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, EMOTION_KEYWORDS)) + "))")
+    return lambda text: (EMOTION_KEYWORDS[match.group(1)] for match in pattern.finditer(text))
+
+_match_emotion_keywords = _build_keyword_matcher()
+
+
+def _log_worker(log_q: queue.Queue, fd: int, path: str):
+    """
+    Background writer: drains up to LOG_WRITE_BATCH queued log entries at a time and
+    writes them with a single call. A None entry stops the worker.
+    Takes no reference to the SoftMemoryMap, so a map that is no longer used can be collected.
+    """
+    while True:
+        batch = [log_q.get()]
+        while len(batch) < LOG_WRITE_BATCH:
+            try:
+                batch.append(log_q.get_nowait())
+            except queue.Empty:
+                break
+        entries = [entry for entry in batch if entry is not None]
+        if entries:
+            try:
+                # One write per batch; the loop only guards against short writes, which would tear a record
+                view = memoryview(b"".join(entries))
+                while view:
+                    view = view[os.write(fd, view):]
+                logger.debug("Wrote %d ERE weight entries to %s", len(entries), path)
+            except OSError as e:
+                logger.error("Error writing to ERE weight log file: %s", e)
+        for _ in batch:
+            log_q.task_done()
+        if len(entries) != len(batch):
+            return
+
+
+def _close_log(log_q: queue.Queue, log_thread: threading.Thread, fd: int):
+    """Stops the log writer once it has written everything queued, then closes the log file."""
+    log_q.put(None)
+    log_thread.join()
+    os.close(fd)
 
 class SoftMemoryMap:
     """
@@ -14,7 +157,8 @@ class SoftMemoryMap:
     by numerical weights that can be updated based on interactions.
     """
 
-    def __init__(self, num_emotions: int = 5, initial_decay_rate: float = 0.01):
+    def __init__(self, num_emotions: int = 5, initial_decay_rate: float = 0.01, use_numba: bool = False,
+                 log_format: str = "binary"):
         """
         Initializes the SoftMemoryMap.
 
@@ -22,49 +166,160 @@ class SoftMemoryMap:
             num_emotions (int): The number of distinct emotional dimensions.
                                 For example, 5 could represent joy, sadness, anger, fear, surprise.
             initial_decay_rate (float): The rate at which emotional weights naturally decay over time.
+            use_numba (bool): If True and numba is installed, updates run through a JIT-compiled kernel.
+            log_format (str): "binary" appends fixed-width records to ERE_WEIGHT_RECORD_FILE (see read_log);
+                              "jsonl" appends human-readable JSON lines to ERE_WEIGHT_LOG_FILE, for debugging.
         """
         if num_emotions <= 0:
-            print("Warning: num_emotions should be a positive integer. Setting to default 5.")
+            logger.warning("num_emotions should be a positive integer. Setting to default 5.")
             num_emotions = 5
         if not (0 <= initial_decay_rate <= 1):
-            print("Warning: initial_decay_rate should be between 0 and 1. Setting to default 0.01.")
+            logger.warning("initial_decay_rate should be between 0 and 1. Setting to default 0.01.")
             initial_decay_rate = 0.01
+        if log_format not in LOG_FORMATS:
+            logger.warning("log_format should be one of %s. Setting to default 'binary'.", LOG_FORMATS)
+            log_format = "binary"
 
+        _import_numpy()
         self.num_emotions = num_emotions
-        # Emotional weights, initialized to a neutral state (e.g., 0.5 for each emotion)
-        self.ere_weights = np.full(num_emotions, 0.5)
-        self.decay_rate = initial_decay_rate
+        # Emotional weights, initialized to a neutral state (e.g., 0.5 for each emotion).
+        # Weights live in [0, 1], so float32 is ample and halves memory traffic vs float64.
+        self.ere_weights = np.full(num_emotions, 0.5, dtype=np.float32)
+        # Scratch buffer for the scaled emotional input, reused across updates
+        self._scratch = np.empty(num_emotions, dtype=np.float32)
+
+        # Pick the update kernel for this shape once, rather than on every update
+        jit_kernel = _get_jit_update_kernel() if use_numba else None
+        if jit_kernel is not None:
+            self._kernel = jit_kernel
+            # Compile (or load from the on-disk cache) up front rather than on the first update
+            self._kernel(np.zeros(1, dtype=np.float32), np.zeros(1, dtype=np.float32), 1.0, 0.0)
+        elif num_emotions <= UNROLL_MAX_EMOTIONS:
+            self._kernel = _make_unrolled_kernel(num_emotions)
+        else:
+            self._kernel = self._ufunc_kernel
+        self.decay_rate = initial_decay_rate # Also caches the retain factor (1 - decay_rate)
         self.emotion_labels = [f"emotion_{i+1}" for i in range(num_emotions)] # Example labels
+        self._emotion_label_tuple = tuple(self.emotion_labels)
 
-        # Ensure the log directory exists
+        # Ensure the log directory exists and keep the log open for the lifetime of the map.
+        # Updates only enqueue serialized log lines; a background thread batches them to disk.
         os.makedirs(LOG_DIR, exist_ok=True)
-        print(f"SoftMemoryMap initialized with {self.num_emotions} emotions and decay rate {self.decay_rate}.")
+        self._log_binary = log_format == "binary"
+        if self._log_binary:
+            self._log_path = ERE_WEIGHT_RECORD_FILE.format(num_emotions=num_emotions)
+            # Reused for every entry; tobytes() takes the copy that is queued
+            self._log_record = np.zeros(1, dtype=_record_dtype(num_emotions))
+        else:
+            self._log_path = ERE_WEIGHT_LOG_FILE
+        self._log_fd = os.open(self._log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if self._log_binary:
+            # Drop an incomplete trailing record (from an interrupted write) so new records stay aligned
+            log_size = os.fstat(self._log_fd).st_size
+            torn = log_size % self._log_record.itemsize
+            if torn:
+                logger.warning("Discarding %d bytes of an incomplete record at the end of %s.", torn, self._log_path)
+                os.ftruncate(self._log_fd, log_size - torn)
+        self._log_q = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._log_dropped = 0
+        self._log_thread = threading.Thread(target=_log_worker, args=(self._log_q, self._log_fd, self._log_path),
+                                            name="ere-weight-log", daemon=True)
+        self._log_thread.start()
+        # Closes the log when the map is garbage collected, or at interpreter exit
+        self._log_finalizer = weakref.finalize(self, _close_log, self._log_q, self._log_thread, self._log_fd)
+        logger.info("SoftMemoryMap initialized with %d emotions and decay rate %s.", self.num_emotions, self.decay_rate)
 
     def update_ere_weights(self, emotional_input: np.ndarray, interaction_strength: float = 1.0):
         """
         Updates the ERE weights based on new emotional input.
 
         Args:
-            emotional_input (np.ndarray): A numpy array representing the emotional impact
+            emotional_input (np.ndarray): A numpy array (or sequence) representing the emotional impact
                                           of the current interaction. Should have the same
                                           dimension as self.num_emotions.
                                           Values typically range from -1 (negative impact) to 1 (positive impact).
             interaction_strength (float): A multiplier indicating how strongly this interaction
                                           affects the emotional weights.
         """
-        if not isinstance(emotional_input, np.ndarray) or emotional_input.shape != (self.num_emotions,):
-            print(f"Error: emotional_input must be a numpy array of shape ({self.num_emotions},).")
+        weights = self.ere_weights
+        n = self.num_emotions
+        try:
+            # No-op for float32 arrays of the right shape; also accepts lists and other dtypes
+            emotional_input = np.ascontiguousarray(emotional_input, dtype=np.float32).reshape(n)
+        except (TypeError, ValueError):
+            logger.error("emotional_input must be a numpy array of shape (%d,).", n)
             return
 
-        # Apply decay to existing weights
-        self.ere_weights = self.ere_weights * (1 - self.decay_rate)
+        retain = self._retain
+        if interaction_strength == 0 or not emotional_input.any():
+            # Decay-only update: no input to add, and w * retain stays within [0, 1], so no clip
+            if retain == 1.0:
+                return # Nothing changes, so nothing is logged either
+            np.multiply(weights, retain, out=weights)
+        else:
+            # Apply decay to existing weights, then apply new emotional input, capped between 0 and 1
+            # We use a simple additive model here, but more complex models could be used
+            self._kernel(weights, emotional_input, retain, float(interaction_strength))
+        logger.debug("ERE weights updated: %s", weights)
+        self._log_ere_weights()
 
-        # Apply new emotional input, capped between 0 and 1
-        # We use a simple additive model here, but more complex models could be used
-        self.ere_weights = np.clip(self.ere_weights + (emotional_input * interaction_strength), 0, 1)
-        print(f"ERE weights updated: {self.ere_weights}")
+    def update_ere_weights_many(self, batch: np.ndarray, strengths: np.ndarray, clip_safe: bool = False):
+        """
+        Applies a batch of updates, equivalent to calling update_ere_weights once per row of
+        `batch` with the matching strength, but with a single log entry for the whole batch.
+
+        Args:
+            batch (np.ndarray): Emotional inputs, one per row, shape (K, self.num_emotions).
+            strengths (np.ndarray): The interaction strength for each row, shape (K,).
+            clip_safe (bool): If True, the caller guarantees that no intermediate weight leaves [0, 1].
+                              The result is then computed in closed form in one vectorized pass,
+                              w_K = w_0 * r^K + sum_k r^(K-1-k) * s_k * ei_k with r = 1 - decay_rate,
+                              which is exact only when the per-step clip never fires.
+                              Otherwise the updates are applied one after another.
+        """
+        n = self.num_emotions
+        try:
+            batch = np.ascontiguousarray(batch, dtype=np.float32).reshape(-1, n)
+            strengths = np.ascontiguousarray(strengths, dtype=np.float32).reshape(batch.shape[0])
+        except (TypeError, ValueError):
+            logger.error("batch must be of shape (K, %d) and strengths of shape (K,).", n)
+            return
+        k = batch.shape[0]
+        if k == 0:
+            return
+
+        weights = self.ere_weights
+        retain = self._retain
+        if clip_safe:
+            r_powers = retain ** np.arange(k - 1, -1, -1, dtype=np.float64)
+            increment = (r_powers * strengths) @ batch
+            np.multiply(weights, retain ** k, out=weights)
+            np.add(weights, increment, out=weights)
+            np.clip(weights, 0.0, 1.0, out=weights)
+        else:
+            kernel = self._kernel
+            for emotional_input, strength in zip(batch, strengths.tolist()):
+                kernel(weights, emotional_input, retain, strength)
+        logger.debug("ERE weights updated by a batch of %d inputs: %s", k, weights)
         self._log_ere_weights()
 
+    @property
+    def decay_rate(self) -> float:
+        """The rate at which emotional weights naturally decay on each update."""
+        return self._decay_rate
+
+    @decay_rate.setter
+    def decay_rate(self, decay_rate: float):
+        self._decay_rate = decay_rate
+        self._retain = 1.0 - float(decay_rate)
+
+    def _ufunc_kernel(self, weights, emotional_input, retain, interaction_strength):
+        """Generic update kernel for any number of emotions, using in-place ufuncs (no temporaries)."""
+        np.multiply(weights, retain, out=weights)
+        np.multiply(emotional_input, interaction_strength, out=self._scratch)
+        np.add(weights, self._scratch, out=weights)
+        np.clip(weights, 0.0, 1.0, out=weights)
+
     def get_current_ere_state(self) -> dict:
         """
         Returns the current emotional state (ERE weights) as a dictionary.
@@ -72,23 +327,82 @@ class SoftMemoryMap:
         Returns:
             dict: A dictionary mapping emotion labels to their current weights.
         """
-        return dict(zip(self.emotion_labels, self.ere_weights.tolist()))
+        return dict(zip(self._emotion_label_tuple, self.ere_weights.tolist()))
+
+    def get_current_ere_state_view(self) -> tuple[list[str], np.ndarray]:
+        """
+        Returns the emotion labels and the live ERE weight array without copying either.
+        Intended for high-frequency readers that index the weights numerically; the array is
+        updated in place by later updates and must not be modified by the caller.
+
+        Returns:
+            tuple[list[str], np.ndarray]: The emotion labels and the current weights, in the same order.
+        """
+        return self.emotion_labels, self.ere_weights
 
     def _log_ere_weights(self):
         """
         Appends the current ERE weights to the log file.
+        The timestamp is stored as integer nanoseconds since the epoch (time.time_ns());
+        conversion to a human-readable form is left to log readers.
         """
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "ere_weights": self.ere_weights.tolist(),
-            "emotion_labels": self.emotion_labels
-        }
+        if self._log_fd is None:
+            return
+        if self._log_binary:
+            record = self._log_record
+            record['ts'] = time.time_ns()
+            record['w'] = self.ere_weights
+            entry = record.tobytes()
+        else:
+            entry = json_io.dumps({
+                "timestamp": time.time_ns(),
+                "ere_weights": self.ere_weights,
+                "emotion_labels": self.emotion_labels
+            }, newline=True)
         try:
-            with open(ERE_WEIGHT_LOG_FILE, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
-            print(f"Logged ERE weights to {ERE_WEIGHT_LOG_FILE}")
-        except IOError as e:
-            print(f"Error writing to ERE weight log file: {e}")
+            self._log_q.put_nowait(entry)
+        except queue.Full:
+            # Never block the update loop on disk; count what was lost instead
+            self._log_dropped += 1
+
+    @classmethod
+    def read_log(cls, path: str, num_emotions: int) -> np.ndarray:
+        """
+        Opens a binary ERE weight log as a read-only, zero-copy structured array.
+
+        Args:
+            path (str): The log file, e.g. ERE_WEIGHT_RECORD_FILE.format(num_emotions=5).
+            num_emotions (int): The number of emotions the log was written with.
+
+        Returns:
+            np.ndarray: A memory-mapped array with fields 'ts' (int64 time_ns) and
+                        'w' (float32 weights, shape (num_emotions,)), one element per update.
+        """
+        _import_numpy()
+        record_dtype = _record_dtype(num_emotions)
+        # Ignore a trailing partial record, e.g. from a crash mid-write
+        num_records = os.path.getsize(path) // record_dtype.itemsize
+        if num_records == 0:
+            return np.empty(0, dtype=record_dtype) # mmap cannot map an empty range
+        return np.memmap(path, dtype=record_dtype, mode='r', shape=(num_records,))
+
+    def flush(self):
+        """
+        Blocks until every queued ERE weight log entry has been written to disk.
+        """
+        if getattr(self, "_log_fd", None) is not None:
+            self._log_q.join()
+
+    def close(self):
+        """
+        Flushes and closes the ERE weight log. Further updates are not logged.
+        """
+        if getattr(self, "_log_fd", None) is None:
+            return
+        self._log_finalizer()
+        self._log_fd = None
+        if self._log_dropped:
+            logger.warning("Dropped %d ERE weight log entries because the log queue was full.", self._log_dropped)
 
     def map_input_to_emotion(self, text_input: str) -> np.ndarray:
         """
@@ -104,19 +418,10 @@ class SoftMemoryMap:
         """
         # This is a simplified example. In a real system, this would be much more complex.
         # For demonstration, let's assume certain keywords trigger specific emotions.
-        emotional_vector = np.zeros(self.num_emotions)
-        text_input_lower = text_input.lower()
-
-        if "happy" in text_input_lower or "joy" in text_input_lower:
-            emotional_vector[0] = 0.2 # Positive impact on 'joy' emotion
-        if "sad" in text_input_lower or "unhappy" in text_input_lower:
-            emotional_vector[1] = 0.2 # Positive impact on 'sadness' emotion
-        if "angry" in text_input_lower or "frustrated" in text_input_lower:
-            emotional_vector[2] = 0.2 # Positive impact on 'anger' emotion
-        if "scared" in text_input_lower or "fear" in text_input_lower:
-            emotional_vector[3] = 0.2 # Positive impact on 'fear' emotion
-        if "surprise" in text_input_lower or "unexpected" in text_input_lower:
-            emotional_vector[4] = 0.2 # Positive impact on 'surprise' emotion
+        # All keywords are found in a single pass over the text (see EMOTION_KEYWORDS).
+        emotional_vector = np.zeros(self.num_emotions, dtype=np.float32)
+        for emotion_index in _match_emotion_keywords(text_input.lower()):
+            emotional_vector[emotion_index] = EMOTION_KEYWORD_IMPACT
 
         # Normalize the vector to ensure values are within a reasonable range for update
         # For simplicity, if sum is greater than 1, scale it down
@@ -125,8 +430,10 @@ class SoftMemoryMap:
 
         return emotional_vector
 
-# Example Usage (for testing purposes, not part of the class itself)
+# Example Usage (for testing purposes, not part of the class itself);
+# run from the repository root with `python -m ere_core.soft_memory_map`
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     memory_map = SoftMemoryMap(num_emotions=5)
     print("Initial ERE State:", memory_map.get_current_ere_state())
 
@@ -0,0 +1,51 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+# Raised by loads() for malformed input. orjson's decode error subclasses it, so callers
+# can catch this whichever backend is in use.
+JSONDecodeError = json.JSONDecodeError
+
+def _default(obj):
+    """Serializes NumPy arrays and scalars (anything with .tolist()), as orjson's OPT_SERIALIZE_NUMPY does."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+# Stdlib encoders used when orjson is unavailable. The data written is plain JSON trees, so the
+# circular-reference check is skipped; compact UTF-8 output matches what orjson writes.
+_COMPACT_ENCODER = json.JSONEncoder(check_circular=False, ensure_ascii=False, separators=(",", ":"),
+                                    default=_default)
+_INDENT_ENCODER = json.JSONEncoder(check_circular=False, ensure_ascii=False, indent=2, default=_default)
+
+def dumps(data, indent: bool = False, newline: bool = False) -> bytes:
+    """
+    Serializes data to UTF-8 JSON bytes, with orjson if it is installed. NumPy arrays are
+    serialized as lists.
+
+    Args:
+        data: The object to serialize.
+        indent (bool): If True, indent by 2 spaces (the only width orjson supports); otherwise compact.
+        newline (bool): If True, append a newline, e.g. for JSON Lines files.
+
+    Returns:
+        bytes: The serialized data.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(data, option=option)
+    text = (_INDENT_ENCODER if indent else _COMPACT_ENCODER).encode(data)
+    return (text + '\n' if newline else text).encode('utf-8')
+
+def loads(data: bytes | str):
+    """Parses JSON from bytes or str, with orjson if it is installed. Raises JSONDecodeError on malformed input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
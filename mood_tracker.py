@@ -1,13 +1,52 @@
+import bisect
+import logging
+import math
 import numpy as np
 import time
 from datetime import datetime
 import json
 import os
+import re
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; _mood_step then runs as plain Python
+    njit = None
+
+logger = logging.getLogger(__name__)
 
 # Assuming ere_core.soft_memory_map is available for current emotional state
 # from ere_core.soft_memory_map import SoftMemoryMap # Not directly imported here to avoid circular dependency,
                                                     # but MoodTracker would likely receive ERE state as input.
 
+# ERE keys whose valence is known outright; any other key is classified by substring match,
+# e.g. "joy_level" counts as positive and "fear_of_loss" as negative.
+POSITIVE_EMOTION_KEYS = frozenset({"positive", "joy", "surprise"})
+NEGATIVE_EMOTION_KEYS = frozenset({"negative", "sadness", "anger", "fear"})
+_CLASSIFIED_EMOTION_KEYS = POSITIVE_EMOTION_KEYS | NEGATIVE_EMOTION_KEYS
+_POSITIVE_EMOTION_PATTERN = re.compile("|".join(POSITIVE_EMOTION_KEYS))
+_NEGATIVE_EMOTION_PATTERN = re.compile("|".join(NEGATIVE_EMOTION_KEYS))
+# Emotion order of SoftMemoryMap's weight vector, and the valence (+1/-1) of each dimension
+ERE_EMOTION_ORDER = ("joy", "sadness", "anger", "fear", "surprise")
+ERE_VALENCE_SIGNS = np.array([1.0 if k in POSITIVE_EMOTION_KEYS else -1.0 for k in ERE_EMOTION_ORDER],
+                             dtype=np.float32)
+
+def _mood_step(score, time_delta, decay_rate, net_emotional_impact):
+    """
+    Returns the new mood score: decay towards neutral (0.5) over time_delta, then apply the
+    net emotional impact, scaled by 0.05 and limited to +/-0.1, keeping the score within [0, 1].
+    Scalar-only (math.exp, no NumPy) so numba can compile it down to a few instructions.
+    """
+    score += (0.5 - score) * (1.0 - math.exp(-decay_rate * time_delta))
+    adjustment = net_emotional_impact * 0.05
+    adjustment = -0.1 if adjustment < -0.1 else (0.1 if adjustment > 0.1 else adjustment)
+    score += adjustment
+    return 0.0 if score < 0.0 else (1.0 if score > 1.0 else score)
+
+if njit is not None:
+    # cache=True keeps the compiled artifact on disk so later runs skip compilation
+    _mood_step = njit(cache=True, fastmath=True)(_mood_step)
+
 class MoodTracker:
     """
     Tracks and manages the AI's overall mood based on aggregated emotional states
@@ -15,6 +54,11 @@ class MoodTracker:
     to a more generalized, long-term mood state.
     """
 
+    __slots__ = (
+        "decay_rate", "current_mood_score", "last_update_time",
+        "mood_thresholds", "sorted_mood_thresholds", "_threshold_scores", "_threshold_labels",
+    )
+
     def __init__(self, decay_rate: float = 0.005, mood_thresholds: dict = None):
         """
         Initializes the MoodTracker.
@@ -26,10 +70,10 @@ class MoodTracker:
                                     Example: {"positive": 0.7, "neutral": 0.4, "negative": 0.1}
         """
         if not (0 <= decay_rate <= 1):
-            print("Warning: decay_rate should be between 0 and 1. Setting to default 0.005.")
+            logger.warning("decay_rate should be between 0 and 1. Setting to default 0.005.")
             decay_rate = 0.005
 
-        self.decay_rate = decay_rate
+        self.decay_rate = float(decay_rate)
         # Mood is represented as a single float, typically between 0 and 1
         # 0.5 could be neutral, >0.5 positive, <0.5 negative
         self.current_mood_score = 0.5
@@ -45,10 +89,14 @@ class MoodTracker:
         }
         # Sort thresholds for easier lookup (descending order of score)
         self.sorted_mood_thresholds = sorted(self.mood_thresholds.items(), key=lambda item: item[1], reverse=True)
+        # Ascending threshold scores and their labels, for a bisect lookup in get_current_mood
+        ascending_thresholds = self.sorted_mood_thresholds[::-1]
+        self._threshold_scores = [threshold for _, threshold in ascending_thresholds]
+        self._threshold_labels = [mood_label for mood_label, _ in ascending_thresholds]
 
-        print(f"MoodTracker initialized with decay rate {self.decay_rate}. Initial mood score: {self.current_mood_score}")
+        logger.info("MoodTracker initialized with decay rate %s. Initial mood score: %s", self.decay_rate, self.current_mood_score)
 
-    def update_mood(self, ere_weights: dict, interaction_intensity: float = 1.0):
+    def update_mood(self, ere_weights: dict, interaction_intensity: float = 1.0, now: float | None = None):
         """
         Updates the overall mood based on the current ERE weights and interaction intensity.
 
@@ -57,35 +105,65 @@ class MoodTracker:
                                 Expected format: {"emotion_1": 0.7, "emotion_2": 0.3, ...}
             interaction_intensity (float): A multiplier indicating how strongly the current interaction
                                            influences the mood.
+            now (float | None): The time.time() timestamp of this update, if the caller already has one.
         """
         if not isinstance(ere_weights, dict):
-            print("Error: ere_weights must be a dictionary.")
+            logger.error("ere_weights must be a dictionary.")
             return
 
-        # Calculate time elapsed since last update for decay
-        current_time = time.time()
-        time_delta = current_time - self.last_update_time
-        self.last_update_time = current_time
-
-        # Apply decay to the current mood score
-        # Mood decays towards neutral (0.5)
-        self.current_mood_score += (0.5 - self.current_mood_score) * (1 - np.exp(-self.decay_rate * time_delta))
+        if interaction_intensity == 0.0:
+            # Nothing to aggregate; only the decay applies
+            self._apply_emotional_impact(0.0, now)
+            return
 
         # Aggregate emotional weights to influence mood
         # This is a simplified aggregation. A more complex model might use specific
         # emotional valences (e.g., joy is positive, sadness is negative).
-        positive_emotions_sum = sum(v for k, v in ere_weights.items() if "positive" in k or "joy" in k or "surprise" in k)
-        negative_emotions_sum = sum(v for k, v in ere_weights.items() if "negative" in k or "sadness" in k or "anger" in k or "fear" in k)
+        # Exact matches are resolved with set intersections; only the remaining keys need a substring scan.
+        keys = ere_weights.keys()
+        positive_emotions_sum = sum(ere_weights[k] for k in keys & POSITIVE_EMOTION_KEYS)
+        negative_emotions_sum = sum(ere_weights[k] for k in keys & NEGATIVE_EMOTION_KEYS)
+        for k in keys - _CLASSIFIED_EMOTION_KEYS:
+            if _POSITIVE_EMOTION_PATTERN.search(k):
+                positive_emotions_sum += ere_weights[k]
+            if _NEGATIVE_EMOTION_PATTERN.search(k):
+                negative_emotions_sum += ere_weights[k]
 
         # Simple net emotional impact
-        net_emotional_impact = (positive_emotions_sum - negative_emotions_sum) * interaction_intensity
+        self._apply_emotional_impact((positive_emotions_sum - negative_emotions_sum) * interaction_intensity, now)
+
+    def update_mood_vec(self, ere_vector: np.ndarray, interaction_intensity: float = 1.0, now: float | None = None):
+        """
+        Updates the overall mood from an ERE weight vector, such as SoftMemoryMap.ere_weights.
+        Equivalent to update_mood with the weights keyed by ERE_EMOTION_ORDER, but the
+        positive/negative aggregation is a single dot product with ERE_VALENCE_SIGNS.
+
+        Args:
+            ere_vector (np.ndarray): The ERE weights, one per emotion in ERE_EMOTION_ORDER.
+            interaction_intensity (float): A multiplier indicating how strongly the current interaction
+                                           influences the mood.
+            now (float | None): The time.time() timestamp of this update, if the caller already has one.
+        """
+        ere_vector = np.asarray(ere_vector, dtype=np.float32)
+        if ere_vector.shape != ERE_VALENCE_SIGNS.shape:
+            logger.error("ere_vector must have shape %s, got %s.", ERE_VALENCE_SIGNS.shape, ere_vector.shape)
+            return
+
+        self._apply_emotional_impact(float(ERE_VALENCE_SIGNS @ ere_vector) * interaction_intensity, now)
+
+    def _apply_emotional_impact(self, net_emotional_impact: float, now: float | None = None):
+        """Decays the mood for the time elapsed since the last update, then applies the net emotional impact."""
+        # Calculate time elapsed since last update for decay
+        current_time = time.time() if now is None else now
+        time_delta = current_time - self.last_update_time
+        self.last_update_time = current_time
 
-        # Adjust mood score based on net emotional impact
-        # Normalize impact to a smaller range, e.g., -0.1 to 0.1, to prevent wild swings
-        mood_adjustment = np.clip(net_emotional_impact * 0.05, -0.1, 0.1)
-        self.current_mood_score = np.clip(self.current_mood_score + mood_adjustment, 0, 1)
+        # Decay the mood towards neutral (0.5), then adjust it based on net emotional impact,
+        # normalized to a smaller range (-0.1 to 0.1) to prevent wild swings
+        self.current_mood_score = _mood_step(float(self.current_mood_score), float(time_delta),
+                                             float(self.decay_rate), float(net_emotional_impact))
 
-        print(f"Mood updated. Current mood score: {self.current_mood_score:.3f}")
+        logger.debug("Mood updated. Current mood score: %.3f", self.current_mood_score)
 
     def get_current_mood(self) -> str:
         """
@@ -94,9 +172,10 @@ class MoodTracker:
         Returns:
             str: A string describing the current mood (e.g., "positive", "neutral", "negative").
         """
-        for mood_label, threshold in self.sorted_mood_thresholds:
-            if self.current_mood_score >= threshold:
-                return mood_label
+        # Highest threshold that the score reaches
+        i = bisect.bisect_right(self._threshold_scores, self.current_mood_score) - 1
+        if i >= 0:
+            return self._threshold_labels[i]
         return "undefined" # Should not happen if thresholds cover full range
 
     def get_mood_score(self) -> float:
@@ -110,6 +189,7 @@ class MoodTracker:
 
 # Example Usage (for testing purposes)
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     mood_tracker = MoodTracker()
     print(f"Initial mood: {mood_tracker.get_current_mood()} ({mood_tracker.get_mood_score():.3f})")
 
@@ -1,16 +1,21 @@
+import itertools
 import json
+import logging
 import os
 import time
-import numpy as np
+from types import MappingProxyType
 
 # Import core components
 from ere_core.soft_memory_map import SoftMemoryMap
 from virem_vault.driver import VIREMVaultDriver
+from config.loader import CONFIG_FILE, load_config
 
 # Define paths
-CONFIG_FILE = "config/config.json"
 SCRATCH_MEMORY_CONCEPT = "Conceptual RAM-only memory, no physical files."
 
+# Per-process interaction sequence number; with the PID it keeps interaction IDs unique
+_interaction_counter = itertools.count(1)
+
 class PresenceAIDemo:
     """
     Entry point for running the AI demo.
@@ -34,24 +39,19 @@ class PresenceAIDemo:
         print(f"Debug Mode: {self.debug_mode}")
         print(f"Scratch Memory: {SCRATCH_MEMORY_CONCEPT}")
 
-    def _load_config(self) -> dict:
-        """Loads configuration from config.json."""
-        try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"Error: {CONFIG_FILE} not found. Please ensure it exists.")
-            return {}
-        except json.JSONDecodeError:
-            print(f"Error: Could not decode JSON from {CONFIG_FILE}. Please check its format.")
-            return {}
-
-    def _simulate_user_interaction(self, prompt: str) -> dict:
+    def _load_config(self) -> MappingProxyType:
+        """Returns the shared, read-only configuration from config.json."""
+        return load_config()
+
+    def _simulate_user_interaction(self, prompt: str, now: float | None = None) -> dict:
         """
         Simulates a user interaction and generates a unique interaction ID.
         In a real system, this would involve receiving actual user input.
+        `now` is the interaction's time.time() timestamp; taken from the clock if omitted.
         """
-        interaction_id = f"interaction_{int(time.time())}_{np.random.randint(1000, 9999)}"
+        if now is None:
+            now = time.time()
+        interaction_id = f"interaction_{int(now)}_{os.getpid()}_{next(_interaction_counter):04d}"
         print(f"\nUser says: '{prompt}' (Interaction ID: {interaction_id})")
         return {"id": interaction_id, "text": prompt}
 
@@ -66,8 +66,11 @@ class PresenceAIDemo:
                 print("Exiting Presence AI Demo. Goodbye!")
                 break
 
+            # One timestamp per interaction, shared by the interaction ID and the stored memory
+            now = time.time()
+
             # 1. Simulate user interaction
-            interaction_details = self._simulate_user_interaction(user_input)
+            interaction_details = self._simulate_user_interaction(user_input, now)
             interaction_id = interaction_details["id"]
             interaction_text = interaction_details["text"]
 
@@ -84,7 +87,7 @@ class PresenceAIDemo:
                     "interaction_id": interaction_id,
                     "user_input": interaction_text,
                     "ere_state_after_interaction": current_ere_state,
-                    "timestamp": time.time()
+                    "timestamp": now
                 }
                 if self.virem_vault.store_memory(interaction_id, memory_data):
                     print(f"Interaction '{interaction_id}' stored in VIREM Vault.")
@@ -109,6 +112,9 @@ class PresenceAIDemo:
 
 # Main execution block
 if __name__ == "__main__":
+    # Component modules log through `logging`; only warnings and errors are shown by default
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+
     # Ensure config.json exists before running the demo
     if not os.path.exists(CONFIG_FILE):
         print(f"Error: {CONFIG_FILE} not found. Please run the previous step to create it.")
@@ -1,14 +1,173 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import mmap
 import os
+import threading
 import json
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
+import weakref
 import hashlib
 import configparser # Although configparser is imported, config.json is used via json module
+from types import MappingProxyType
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; without it memories are stored uncompressed
+    zstandard = None
+
+import json_io
+from config.loader import CONFIG_FILE, load_config
+from virem_vault.segment_log import INDEX_FILE, SegmentLog
 
 # Define paths
-CONFIG_FILE = "config/config.json"
 VAULT_DATA_DIR = "vault_data"
 KEY_DERIVATION_SALT = b'presence_ai_ghost_vault_salt' # A fixed salt for key derivation
+KEY_DERIVATION_ITERATIONS = 100_000 # PBKDF2-HMAC-SHA256 rounds per wake phrase
+VAULT_WRITE_BUFFER_SIZE = 64 * 1024 # Pending memory bytes that trigger a write to disk
+MMAP_READ_THRESHOLD = 64 * 1024 # .ghost files larger than this are memory-mapped rather than read into bytes
+# "files" stores one .ghost file per memory; "segmented" appends memories to a SegmentLog
+VAULT_LAYOUTS = ("files", "segmented")
+SEGMENT_DIR = "segments"
+# vault.compression config values. Compressed plaintext is recognised by the zstd frame magic,
+# which JSON never starts with, so compressed and uncompressed memories can be mixed.
+VAULT_COMPRESSIONS = ("none", "zstd")
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+COMPRESSION_MIN_SIZE = 512 # Smaller memories are stored uncompressed; zstd gains little on them
+
+logger = logging.getLogger(__name__)
+
+# Hash constructors, bound once for the legacy key derivation and file naming. In standard
+# CPython builds hashlib.sha256 is OpenSSL's EVP implementation, which uses SHA-NI where available.
+_sha256 = hashlib.sha256
+_blake2b = hashlib.blake2b
+# Encrypted .ghost files are a format byte + 12-byte nonce + raw AEAD ciphertext (tag included).
+# Files written before AES-GCM are Fernet tokens (base64, so they never start with a format byte).
+# Formats 1 and 2 (and Fernet) are keyed with a single salted SHA-256 of the wake phrase; 3 and 4,
+# which new memories are written with, are keyed with PBKDF2.
+GHOST_FORMAT_AESGCM = b'\x01'
+GHOST_FORMAT_CHACHA20 = b'\x02'
+GHOST_FORMAT_AESGCM_PBKDF2 = b'\x03'
+GHOST_FORMAT_CHACHA20_PBKDF2 = b'\x04'
+AEAD_NONCE_SIZE = 12
+AEAD_TAG_SIZE = 16
+# vault.cipher config values and the format byte new memories are written with
+VAULT_CIPHERS = {"aes-gcm": GHOST_FORMAT_AESGCM_PBKDF2, "chacha20-poly1305": GHOST_FORMAT_CHACHA20_PBKDF2}
+_AEAD_CLASSES = {
+    GHOST_FORMAT_AESGCM: AESGCM, GHOST_FORMAT_CHACHA20: ChaCha20Poly1305,
+    GHOST_FORMAT_AESGCM_PBKDF2: AESGCM, GHOST_FORMAT_CHACHA20_PBKDF2: ChaCha20Poly1305,
+}
+_SHA256_KEYED_FORMATS = frozenset((GHOST_FORMAT_AESGCM, GHOST_FORMAT_CHACHA20))
+
+def _decompress(plaintext: bytes) -> bytes:
+    """Returns the JSON bytes of a memory's plaintext, decompressing it if it is a zstd frame."""
+    if plaintext[:4] != ZSTD_MAGIC:
+        return plaintext
+    if zstandard is None:
+        raise ValueError("memory is zstd-compressed but the zstandard package is not installed")
+    return zstandard.ZstdDecompressor().decompress(plaintext)
+
+@functools.lru_cache(maxsize=4096)
+def _memory_name(memory_id: str) -> str:
+    """Maps a memory ID to the name it is stored under. Cached, as the same IDs are typically stored, then retrieved/deleted."""
+    # Use a hash of the memory_id to create a filename, ensuring valid filenames.
+    # A 128-bit BLAKE2b digest is plenty for uniqueness and cheaper than SHA-256.
+    return _blake2b(memory_id.encode('utf-8'), digest_size=16).hexdigest()
+
+def _shard_filepath(vault_location: str, name: str) -> str:
+    """
+    Returns the .ghost file path for a hex file name. Files are sharded into two levels of
+    subdirectories by name prefix (ab/cd/abcd....ghost) so no directory grows large.
+    """
+    return os.path.join(vault_location, name[:2], name[2:4], f"{name}.ghost")
+
+@functools.lru_cache(maxsize=4096)
+def _memory_filepath(vault_location: str, memory_id: str) -> str:
+    """Maps a memory ID to its .ghost file."""
+    return _shard_filepath(vault_location, _memory_name(memory_id))
+
+# Serializes cold derivations, so concurrent retrievals with a new phrase run PBKDF2 once, not once per thread
+_KEY_DERIVATION_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=16)
+def _keys_for_phrase(phrase: str) -> tuple[bytes, bytes]:
+    """
+    Derives the 256-bit vault keys for a wake phrase: the PBKDF2 key new memories are written with,
+    and the SHA-256 key of older formats. PBKDF2 is deliberately slow (tens of milliseconds), so the
+    keys are cached: one phrase typically unlocks many memories. The cache keeps phrases and keys
+    in memory until VIREMVaultDriver.clear_key_cache() is called.
+    """
+    phrase_bytes = phrase.encode('utf-8')
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=KEY_DERIVATION_SALT,
+                     iterations=KEY_DERIVATION_ITERATIONS)
+    # Note: For production, consider a per-vault random salt stored alongside the vault.
+    return kdf.derive(phrase_bytes), _sha256(phrase_bytes + KEY_DERIVATION_SALT).digest()
+
+@functools.lru_cache(maxsize=8)
+def _cipher_for(ghost_format: bytes, key: bytes) -> AESGCM | ChaCha20Poly1305:
+    """Returns the AEAD cipher for a .ghost format byte and 256-bit key, shared by every driver in the process."""
+    return _AEAD_CLASSES[ghost_format](key)
+
+@functools.lru_cache(maxsize=8)
+def _legacy_fernet_for(key: bytes) -> Fernet:
+    """Returns the Fernet cipher for a 256-bit key, as used by vaults written before AES-GCM."""
+    return Fernet(base64.urlsafe_b64encode(key))
+
+@functools.lru_cache(maxsize=1024)
+def _legacy_memory_filepath(vault_location: str, memory_id: str) -> str:
+    """
+    Maps a memory ID to the SHA-256 named .ghost file used by older vaults. Cached, as every
+    delete and every retrieve that misses the current file name looks it up.
+    """
+    return _shard_filepath(vault_location, _sha256(memory_id.encode('utf-8')).hexdigest())
+
+def _write_pending(pending: dict, shard_dirs: set) -> list[str]:
+    """
+    Writes pending memories ({filepath: bytes}) to their .ghost files, created owner-read/write only.
+    Written memories are removed from pending; memories that could not be written stay in it.
+
+    Returns:
+        list[str]: The files that could not be written.
+    """
+    failed = []
+    for filepath, payload in list(pending.items()):
+        try:
+            shard_dir = os.path.dirname(filepath)
+            if shard_dir not in shard_dirs:
+                os.makedirs(shard_dir, exist_ok=True)
+                shard_dirs.add(shard_dir)
+            fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                # The payload is fully encoded and encrypted before the file is opened; a single
+                # write normally stores it, the loop only guards against short writes
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.error("Error writing memory file %s: %s", filepath, e)
+            failed.append(filepath)
+        else:
+            del pending[filepath]
+    return failed
+
+def _close_vault(pending: dict, shard_dirs: set, segment_log: SegmentLog | None):
+    """
+    Writes a driver's pending memories and closes its segment log. Run when the driver is
+    garbage collected or at interpreter exit; takes no reference to the driver itself.
+    """
+    try:
+        _write_pending(pending, shard_dirs)
+        if segment_log is not None:
+            segment_log.close()
+    except OSError as e:
+        logger.error("Error closing VIREM Vault: %s", e)
 
 class VIREMVaultDriver:
     """
@@ -25,50 +184,161 @@ class VIREMVaultDriver:
         self.config = self._load_config()
         self.vault_location = self.config.get("vault", {}).get("location", VAULT_DATA_DIR)
         self.encryption_enabled = self.config.get("vault", {}).get("encryption_enabled", True)
+        cipher = self.config.get("vault", {}).get("cipher", "aes-gcm")
+        if cipher not in VAULT_CIPHERS:
+            logger.warning("Vault cipher should be one of %s. Setting to default 'aes-gcm'.", tuple(VAULT_CIPHERS))
+            cipher = "aes-gcm"
+        # New memories are written with this cipher; every supported format can be read back
+        self.cipher = cipher
+        self._ghost_format = VAULT_CIPHERS[cipher]
+        compression = self.config.get("vault", {}).get("compression", "none")
+        if compression not in VAULT_COMPRESSIONS:
+            logger.warning("Vault compression should be one of %s. Setting to default 'none'.", VAULT_COMPRESSIONS)
+            compression = "none"
+        if compression == "zstd" and zstandard is None:
+            logger.warning("Vault compression 'zstd' requires the zstandard package. Storing memories uncompressed.")
+            compression = "none"
+        self.compression = compression
+        self._zstd_compressor = zstandard.ZstdCompressor(level=3) if compression == "zstd" else None
+        self.layout = self.config.get("vault", {}).get("layout", "files")
+        if self.layout not in VAULT_LAYOUTS:
+            logger.warning("Vault layout should be one of %s. Setting to default 'files'.", VAULT_LAYOUTS)
+            self.layout = "files"
 
         # Ensure the vault data directory exists
         os.makedirs(self.vault_location, exist_ok=True)
-        print(f"VIREM Vault initialized. Location: {self.vault_location}, Encryption Enabled: {self.encryption_enabled}")
-        print("Note: Encryption key is now derived from a wake phrase for Ghost Vault functionality.")
 
-    def _load_config(self) -> dict:
-        """Loads configuration from config.json."""
+        # The segmented layout appends memories to long-lived segment files, keyed by memory name
+        self._segment_log = None
+        if self.layout == "segmented":
+            self._segment_log = SegmentLog(os.path.join(self.vault_location, SEGMENT_DIR))
+        else:
+            self._migrate_flat_layout()
+        self._shard_dirs = set() # Shard directories known to exist
+
+        # Stored memories are kept in memory ({filepath: bytes}) and written out in batches,
+        # once VAULT_WRITE_BUFFER_SIZE bytes are pending, on flush()/close(), or when the driver is
+        # garbage collected or the interpreter exits. flush() updates _pending in place, as the finalizer holds it.
+        self._pending = {}
+        self._pending_bytes = 0
+        weakref.finalize(self, _close_vault, self._pending, self._shard_dirs, self._segment_log)
+        logger.info("VIREM Vault initialized. Location: %s, Layout: %s, Encryption Enabled: %s, Cipher: %s", self.vault_location, self.layout, self.encryption_enabled, self.cipher)
+        logger.info("Note: Encryption key is now derived from a wake phrase for Ghost Vault functionality.")
+
+    def _migrate_flat_layout(self):
+        """
+        Moves .ghost files left in the vault root by the unsharded layout into their shard directories.
+        Cheap once migrated: the vault root then only holds shard directories.
+        """
+        moved = 0
         try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"Error: {CONFIG_FILE} not found. Using default settings.")
-            return {}
-        except json.JSONDecodeError:
-            print(f"Error: Could not decode JSON from {CONFIG_FILE}. Using default settings.")
-            return {}
+            with os.scandir(self.vault_location) as entries:
+                flat_files = [entry.name for entry in entries if entry.name.endswith(".ghost") and entry.is_file()]
+            for name in flat_files:
+                filepath = _shard_filepath(self.vault_location, name[:-len(".ghost")])
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                os.replace(os.path.join(self.vault_location, name), filepath)
+                moved += 1
+        except OSError as e:
+            logger.error("Error migrating vault files into shard directories: %s", e)
+        if moved:
+            logger.info("Moved %d .ghost files into shard directories.", moved)
 
-    def _derive_key_from_phrase(self, phrase: str) -> Fernet:
+    def migrate_legacy_names(self, memory_ids) -> int:
         """
-        Derives a Fernet encryption key from a given wake phrase using SHA256.
+        Renames .ghost files stored under the SHA-256 names of older vaults to the current BLAKE2b names,
+        so retrieval no longer needs the legacy fallback. File names are one-way hashes, so the memory
+        IDs to migrate must be supplied. A legacy file whose memory has since been stored under the
+        current name is stale and is removed.
 
         Args:
-            phrase (str): The wake phrase to use for key derivation.
+            memory_ids (Iterable[str]): The memory IDs to migrate; IDs without a legacy file are skipped.
 
         Returns:
-            Fernet: An initialized Fernet cipher object.
+            int: The number of legacy files renamed or removed.
         """
+        migrated = 0
+        for memory_id in memory_ids:
+            legacy_filepath = _legacy_memory_filepath(self.vault_location, memory_id)
+            filepath = self._get_memory_filepath(memory_id)
+            try:
+                if filepath in self._pending or os.path.exists(filepath):
+                    os.unlink(legacy_filepath)
+                else:
+                    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                    os.replace(legacy_filepath, filepath)
+                migrated += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error("Error migrating memory '%s' to its current file name: %s", memory_id, e)
+        if migrated:
+            logger.info("Migrated %d memories from SHA-256 to BLAKE2b file names.", migrated)
+        return migrated
+
+    def _load_config(self) -> MappingProxyType:
+        """Returns the shared, read-only configuration from config.json."""
+        return load_config()
+
+    def _check_wake_phrase(self, phrase: str):
+        """Raises ValueError unless phrase is a non-empty string."""
         if not isinstance(phrase, str) or not phrase:
             raise ValueError("Wake phrase cannot be empty or non-string.")
 
-        # Use PBKDF2HMAC for stronger key derivation in a real application,
-        # but for simplicity and to match user's example, we'll use sha256 + base64.
-        # Note: For production, consider using `kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), ...)`
-        # and storing salt securely.
-        hashed_phrase = hashlib.sha256(phrase.encode('utf-8') + KEY_DERIVATION_SALT).digest()
-        key = base64.urlsafe_b64encode(hashed_phrase)
-        return Fernet(key)
+    def _derive_key_from_phrase(self, phrase: str) -> tuple[bytes, bytes]:
+        """
+        Derives the 256-bit encryption keys for a given wake phrase using PBKDF2-HMAC-SHA256,
+        plus the single-round SHA256 key that older .ghost formats were encrypted with.
+        PBKDF2 is slow on a phrase's first use, so callers derive keys only when they will encrypt or decrypt.
+
+        Args:
+            phrase (str): The wake phrase to use for key derivation.
+
+        Returns:
+            tuple[bytes, bytes]: The PBKDF2 key and the legacy SHA256 key.
+        """
+        self._check_wake_phrase(phrase)
+        with _KEY_DERIVATION_LOCK:
+            return _keys_for_phrase(phrase)
+
+    def clear_key_cache(self):
+        """
+        Forgets all cached wake-phrase keys and ciphers, e.g. on logout. The caches are shared by
+        every driver in the process; later operations derive their keys again.
+        """
+        _keys_for_phrase.cache_clear()
+        _cipher_for.cache_clear()
+        _legacy_fernet_for.cache_clear()
+        logger.debug("Vault key cache cleared.")
+
+    def _encrypt(self, keys: tuple[bytes, bytes], payload: bytes) -> bytes:
+        """Encrypts a memory payload into the .ghost format (format byte + nonce + ciphertext)."""
+        nonce = os.urandom(AEAD_NONCE_SIZE)
+        return self._ghost_format + nonce + _cipher_for(self._ghost_format, keys[0]).encrypt(nonce, payload, None)
+
+    def _decrypt(self, keys: tuple[bytes, bytes], stored_data: bytes) -> bytes:
+        """
+        Decrypts a .ghost payload in any supported format, including legacy Fernet.
+        Raises InvalidTag/InvalidToken if the phrase is wrong or the data is corrupted.
+        """
+        key, legacy_key = keys
+        ghost_format = stored_data[:1]
+        if ghost_format in _AEAD_CLASSES:
+            if ghost_format in _SHA256_KEYED_FORMATS:
+                key = legacy_key
+            nonce_end = 1 + AEAD_NONCE_SIZE
+            if len(stored_data) < nonce_end + AEAD_TAG_SIZE:
+                # Truncated record; report it like any other corrupted ciphertext
+                raise InvalidTag()
+            # Decrypt straight from the buffer (which may be a memory-mapped file) without slicing copies
+            with memoryview(stored_data) as view:
+                return _cipher_for(ghost_format, key).decrypt(view[1:nonce_end], view[nonce_end:], None)
+        # Fernet only accepts bytes; [:] is a no-op for bytes and copies a memory-mapped file
+        return _legacy_fernet_for(legacy_key).decrypt(stored_data[:])
 
     def _get_memory_filepath(self, memory_id: str) -> str:
         """Generates a file path for a given memory ID with a .ghost extension."""
-        # Use a hash of the memory_id to create a filename, ensuring valid filenames
-        safe_memory_id = hashlib.sha256(memory_id.encode('utf-8')).hexdigest()
-        return os.path.join(self.vault_location, f"{safe_memory_id}.ghost")
+        return _memory_filepath(self.vault_location, memory_id)
 
     def store_memory(self, memory_id: str, data: dict, wake_phrase: str) -> bool:
         """
@@ -84,26 +354,28 @@ class VIREMVaultDriver:
         Returns:
             bool: True if memory was stored successfully, False otherwise.
         """
-        filepath = self._get_memory_filepath(memory_id)
         try:
-            fernet = self._derive_key_from_phrase(wake_phrase)
-            json_data = json.dumps(data)
+            self._check_wake_phrase(wake_phrase)
+            payload = json_io.dumps(data)
+            if self._zstd_compressor is not None and len(payload) >= COMPRESSION_MIN_SIZE:
+                # Compress before encrypting: less to encrypt and to write
+                payload = self._zstd_compressor.compress(payload)
             if self.encryption_enabled:
-                encrypted_data = fernet.encrypt(json_data.encode('utf-8'))
-                with open(filepath, 'wb') as f:
-                    f.write(encrypted_data)
-                print(f"Memory '{memory_id}' encrypted and stored as .ghost file.")
+                payload = self._encrypt(self._derive_key_from_phrase(wake_phrase), payload)
+                logger.debug("Memory '%s' encrypted and stored as .ghost file.", memory_id)
             else:
                 # If encryption is disabled, store in plain JSON (not recommended for Ghost Vault)
-                with open(filepath, 'w') as f:
-                    f.write(json_data)
-                print(f"Memory '{memory_id}' stored (unencrypted, not true Ghost Vault).")
+                logger.debug("Memory '%s' stored (unencrypted, not true Ghost Vault).", memory_id)
+            if self._segment_log is not None:
+                self._segment_log.put(_memory_name(memory_id), payload)
+            else:
+                self._queue_write(self._get_memory_filepath(memory_id), payload)
             return True
         except ValueError as ve:
-            print(f"Error deriving key for storing memory '{memory_id}': {ve}")
+            logger.error("Error deriving key for storing memory '%s': %s", memory_id, ve)
             return False
         except Exception as e:
-            print(f"Error storing memory '{memory_id}': {e}")
+            logger.error("Error storing memory '%s': %s", memory_id, e)
             return False
 
     def retrieve_memory(self, memory_id: str, wake_phrase: str) -> dict | None:
@@ -119,41 +391,136 @@ class VIREMVaultDriver:
             dict | None: The retrieved memory data as a dictionary, or None if not found,
                          decryption fails, or an error occurs.
         """
-        filepath = self._get_memory_filepath(memory_id)
-        if not os.path.exists(filepath):
-            print(f"Memory '{memory_id}' (.ghost file) not found at {filepath}.")
+        try:
+            self._check_wake_phrase(wake_phrase)
+        except ValueError as ve:
+            logger.error("Error deriving key for retrieving memory '%s': %s", memory_id, ve)
             return None
+        return self._retrieve_one(memory_id, wake_phrase)
+
+    def bulk_retrieve(self, memory_ids: list[str], wake_phrase: str) -> dict[str, dict | None]:
+        """
+        Retrieves many memories stored under the same wake phrase; the key is derived at most once.
+
+        Args:
+            memory_ids (list[str]): The unique identifiers of the memories to retrieve.
+            wake_phrase (str): The phrase required to decrypt these memories.
+
+        Returns:
+            dict[str, dict | None]: Each memory ID mapped to its data, or to None if it is not found,
+                                    decryption fails, or an error occurs (as for retrieve_memory).
+        """
+        try:
+            self._check_wake_phrase(wake_phrase)
+        except ValueError as ve:
+            logger.error("Error deriving key for retrieving %d memories: %s", len(memory_ids), ve)
+            return dict.fromkeys(memory_ids)
+        return {memory_id: self._retrieve_one(memory_id, wake_phrase) for memory_id in memory_ids}
+
+    def retrieve_many(self, memory_ids: list[str], wake_phrase: str, max_workers: int | None = None) -> dict[str, dict | None]:
+        """
+        Like bulk_retrieve, but reads and decrypts the memories on a thread pool. File reads and the
+        AEAD decryption release the GIL, so large batches overlap disk latency with decryption.
+
+        Args:
+            memory_ids (list[str]): The unique identifiers of the memories to retrieve.
+            wake_phrase (str): The phrase required to decrypt these memories.
+            max_workers (int | None): Thread pool size; None uses ThreadPoolExecutor's default.
+
+        Returns:
+            dict[str, dict | None]: Each memory ID mapped to its data, or to None if it is not found,
+                                    decryption fails, or an error occurs (as for retrieve_memory).
+        """
+        if len(memory_ids) < 2 or max_workers == 1:
+            return self.bulk_retrieve(memory_ids, wake_phrase)
+        try:
+            self._check_wake_phrase(wake_phrase)
+        except ValueError as ve:
+            logger.error("Error deriving key for retrieving %d memories: %s", len(memory_ids), ve)
+            return dict.fromkeys(memory_ids)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda memory_id: self._retrieve_one(memory_id, wake_phrase), memory_ids)
+            return dict(zip(memory_ids, results))
+
+    def _read_stored_memory(self, memory_id: str) -> tuple[str | None, bytes | None]:
+        """
+        Returns the .ghost file path and stored bytes of a memory, as (None, None) if it does not exist.
+        Pending (not yet flushed) memories are returned from the write buffer. Files larger than
+        MMAP_READ_THRESHOLD are returned as a read-only mmap, which the caller must close.
+        """
+        filepath = self._get_memory_filepath(memory_id)
+        stored_data = self._pending.get(filepath)
+        if stored_data is not None:
+            return filepath, stored_data
+
+        try:
+            fd = os.open(filepath, os.O_RDONLY)
+        except FileNotFoundError:
+            # Fall back to the SHA-256 file name used by older vaults
+            legacy_filepath = _legacy_memory_filepath(self.vault_location, memory_id)
+            try:
+                fd = os.open(legacy_filepath, os.O_RDONLY)
+            except FileNotFoundError:
+                logger.debug("Memory '%s' (.ghost file) not found at %s.", memory_id, filepath)
+                return None, None
+            filepath = legacy_filepath
+        # .ghost files are usually small; read them with one unbuffered read sized from fstat
+        try:
+            size = os.fstat(fd).st_size
+            if size > MMAP_READ_THRESHOLD:
+                stored_data = mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+            else:
+                stored_data = os.read(fd, size)
+        finally:
+            os.close(fd)
+        return filepath, stored_data
 
+    def _retrieve_one(self, memory_id: str, wake_phrase: str) -> dict | None:
+        """
+        Retrieves and decrypts one memory with an already validated wake phrase. Keys are derived
+        (or taken from the key cache) only once the memory has been found.
+        """
+        filepath = stored_data = None
         try:
-            fernet = self._derive_key_from_phrase(wake_phrase)
+            if self._segment_log is not None:
+                stored_data = self._segment_log.get(_memory_name(memory_id))
+                if stored_data is None:
+                    logger.debug("Memory '%s' not found in the segment log.", memory_id)
+                    return None
+            else:
+                filepath, stored_data = self._read_stored_memory(memory_id)
+                if stored_data is None:
+                    return None
             if self.encryption_enabled:
-                with open(filepath, 'rb') as f:
-                    encrypted_data = f.read()
-                decrypted_data = fernet.decrypt(encrypted_data).decode('utf-8')
-                print(f"Memory '{memory_id}' decrypted and retrieved with correct phrase.")
-                return json.loads(decrypted_data)
+                decrypted_data = self._decrypt(self._derive_key_from_phrase(wake_phrase), stored_data)
+                logger.debug("Memory '%s' decrypted and retrieved with correct phrase.", memory_id)
+                return json_io.loads(_decompress(decrypted_data))
             else:
                 # If encryption is disabled, retrieve plain JSON
-                with open(filepath, 'r') as f:
-                    json_data = f.read()
-                print(f"Memory '{memory_id}' retrieved (unencrypted).")
-                return json.loads(json_data)
-        except InvalidToken:
-            print(f"❌ Incorrect wake phrase or corrupted vault for memory '{memory_id}'. Memory remains hidden.")
+                logger.debug("Memory '%s' retrieved (unencrypted).", memory_id)
+                return json_io.loads(_decompress(stored_data[:]))
+        except (InvalidTag, InvalidToken):
+            logger.warning("Incorrect wake phrase or corrupted vault for memory '%s'. Memory remains hidden.", memory_id)
             return None
         except ValueError as ve:
-            print(f"Error deriving key for retrieving memory '{memory_id}': {ve}")
+            # Not valid JSON, e.g. an encrypted memory read with encryption disabled; the file is kept
+            logger.error("Could not decode memory '%s': %s", memory_id, ve)
             return None
         except Exception as e:
-            print(f"Error retrieving memory '{memory_id}': {e}")
+            logger.error("Error retrieving memory '%s': %s", memory_id, e)
             # Attempt to delete potentially corrupted file if other errors occur
-            if os.path.exists(filepath):
+            if filepath is not None:
                 try:
-                    os.remove(filepath)
-                    print(f"Removed potentially corrupted memory file: {filepath}")
+                    os.unlink(filepath)
+                    logger.warning("Removed potentially corrupted memory file: %s", filepath)
+                except FileNotFoundError:
+                    pass
                 except OSError as oe:
-                    print(f"Error removing corrupted file {filepath}: {oe}")
+                    logger.error("Error removing corrupted file %s: %s", filepath, oe)
             return None
+        finally:
+            if isinstance(stored_data, mmap.mmap):
+                stored_data.close()
 
     def delete_memory(self, memory_id: str) -> bool:
         """
@@ -165,20 +532,89 @@ class VIREMVaultDriver:
         Returns:
             bool: True if memory was deleted successfully, False otherwise.
         """
-        filepath = self._get_memory_filepath(memory_id)
-        if not os.path.exists(filepath):
-            print(f"Memory '{memory_id}' (.ghost file) not found for deletion.")
+        if self._segment_log is not None:
+            try:
+                if self._segment_log.delete(_memory_name(memory_id)):
+                    logger.debug("Memory '%s' deleted from the segment log.", memory_id)
+                    return True
+            except OSError as e:
+                logger.error("Error deleting memory '%s': %s", memory_id, e)
+                return False
+            logger.debug("Memory '%s' not found for deletion.", memory_id)
             return False
-        try:
-            os.remove(filepath)
-            print(f"Memory '{memory_id}' (.ghost file) deleted successfully.")
+
+        filepath = self._get_memory_filepath(memory_id)
+        pending_data = self._pending.pop(filepath, None)
+        deleted = pending_data is not None
+        if deleted:
+            self._pending_bytes -= len(pending_data)
+        # Also remove any copy stored under the SHA-256 file name used by older vaults
+        for path in (filepath, _legacy_memory_filepath(self.vault_location, memory_id)):
+            try:
+                os.unlink(path)
+                deleted = True
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error("Error deleting memory '%s' (%s): %s", memory_id, path, e)
+                return False
+        if deleted:
+            logger.debug("Memory '%s' (.ghost file) deleted successfully.", memory_id)
             return True
-        except OSError as e:
-            print(f"Error deleting memory '{memory_id}': {e}")
-            return False
+        logger.debug("Memory '%s' (.ghost file) not found for deletion.", memory_id)
+        return False
+
+    def _queue_write(self, filepath: str, payload: bytes):
+        """
+        Queues a memory file write, flushing the batch once enough bytes are pending.
+        Memories that fail to write stay queued; flush() reports them.
+        """
+        previous = self._pending.get(filepath)
+        if previous is not None:
+            self._pending_bytes -= len(previous)
+        self._pending[filepath] = payload
+        self._pending_bytes += len(payload)
+        if self._pending_bytes >= VAULT_WRITE_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> list[str]:
+        """
+        Writes all pending memories to their .ghost files. Files are created owner-read/write only.
+        With the segmented layout, saves the segment log's index instead.
+        Memories that could not be written stay pending and are retried on the next flush.
+
+        Returns:
+            list[str]: The files (or segment index) that could not be written; empty if everything was saved.
+        """
+        failed = []
+        if self._segment_log is not None:
+            try:
+                self._segment_log.flush()
+            except OSError as e:
+                logger.error("Error saving segment log index: %s", e)
+                failed.append(os.path.join(self._segment_log.directory, INDEX_FILE))
+        if self._pending:
+            failed += _write_pending(self._pending, self._shard_dirs)
+            self._pending_bytes = sum(map(len, self._pending.values()))
+        return failed
+
+    def close(self) -> list[str]:
+        """
+        Flushes pending memories. The driver stays usable; later stores are buffered again.
+
+        Returns:
+            list[str]: The files that could not be written, as for flush().
+        """
+        failed = self.flush()
+        if self._segment_log is not None:
+            # Releases the segment file descriptors; the log reopens them on next use
+            self._segment_log.close()
+        return failed
 
-# Example Usage (for testing purposes, not part of the class itself)
+# Example Usage (for testing purposes, not part of the class itself);
+# run from the repository root with `python -m virem_vault.driver`
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     # Ensure a config.json exists for testing
     if not os.path.exists(CONFIG_FILE):
         os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
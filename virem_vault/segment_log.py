@@ -0,0 +1,241 @@
+import logging
+import os
+import struct
+
+import json_io
+
+SEGMENT_SIZE = 64 * 1024 * 1024 # A new segment file is started once the active one reaches this size
+INDEX_FLUSH_INTERVAL = 256 # Writes between index persists; later records are replayed on open
+INDEX_FILE = "index.json"
+_RECORD_HEADER = struct.Struct("<HI") # Key length, payload length
+_TOMBSTONE = 0xFFFFFFFF # Payload length marking a deleted key
+
+logger = logging.getLogger(__name__)
+
+class SegmentLog:
+    """
+    Append-only key/value store made of numbered segment files (segment_000000.log, ...).
+    Each record is a header (key length, payload length), the UTF-8 key and the payload;
+    a delete appends a tombstone record. An in-memory index maps each key to its
+    (segment, offset, length), so a read is a single pread on a long-lived descriptor.
+
+    The index is saved to index.json every index_flush_interval writes and on flush()/close().
+    On open, records appended after the saved index are replayed, and an incomplete
+    trailing record (from an interrupted write) is discarded.
+    Overwritten and deleted records are not reclaimed; segments only grow.
+    get() may be called from several threads at once; writes must not run concurrently.
+    """
+
+    def __init__(self, directory: str, segment_size: int = SEGMENT_SIZE,
+                 index_flush_interval: int = INDEX_FLUSH_INTERVAL):
+        """
+        Opens (or creates) the segment log in the given directory.
+
+        Args:
+            directory (str): Directory holding the segment files and index.json.
+            segment_size (int): Size in bytes after which a new segment file is started.
+            index_flush_interval (int): Number of writes between index saves.
+        """
+        self.directory = directory
+        self.segment_size = segment_size
+        self.index_flush_interval = index_flush_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._append_fd = None
+        self._read_fds = {} # {segment_id: fd}
+        self._unsaved_writes = 0
+        self._index, (self._segment_id, self._segment_offset) = self._load_index()
+        self._replay(self._segment_id, self._segment_offset)
+
+    def _segment_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"segment_{segment_id:06d}.log")
+
+    def _load_index(self) -> tuple[dict, tuple[int, int]]:
+        """Loads the saved index and the (segment, offset) it covers, or an empty index covering nothing."""
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), 'rb') as f:
+                saved = json_io.loads(f.read())
+            index = {key: tuple(entry) for key, entry in saved["entries"].items()}
+            return index, tuple(saved["position"])
+        except FileNotFoundError:
+            return {}, (0, 0)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Could not read segment index (%s); rebuilding it from the segments.", e)
+            return {}, (0, 0)
+
+    def _replay(self, segment_id: int, offset: int):
+        """Applies the records from (segment_id, offset) onwards to the index."""
+        while True:
+            path = self._segment_path(segment_id)
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read()
+            except FileNotFoundError:
+                break
+
+            pos = 0
+            while pos + _RECORD_HEADER.size <= len(data):
+                key_len, length = _RECORD_HEADER.unpack_from(data, pos)
+                start = pos + _RECORD_HEADER.size + key_len
+                end = start if length == _TOMBSTONE else start + length
+                if end > len(data):
+                    break
+                key = data[pos + _RECORD_HEADER.size:start].decode('utf-8')
+                if length == _TOMBSTONE:
+                    self._index.pop(key, None)
+                else:
+                    self._index[key] = (segment_id, offset + start, length)
+                self._unsaved_writes += 1
+                pos = end
+
+            if pos < len(data):
+                logger.warning("Discarding %d bytes of an incomplete record at the end of %s.", len(data) - pos, path)
+                os.truncate(path, offset + pos)
+            self._segment_id, self._segment_offset = segment_id, offset + pos
+            segment_id, offset = segment_id + 1, 0
+
+    def _get_append_fd(self) -> int:
+        if self._append_fd is None:
+            if self._segment_offset >= self.segment_size:
+                self._segment_id, self._segment_offset = self._segment_id + 1, 0
+            self._append_fd = os.open(self._segment_path(self._segment_id),
+                                      os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        return self._append_fd
+
+    def _get_read_fd(self, segment_id: int) -> int:
+        fd = self._read_fds.get(segment_id)
+        if fd is None:
+            fd = os.open(self._segment_path(segment_id), os.O_RDONLY)
+            # Concurrent readers may race to open the same segment; keep the first descriptor
+            cached_fd = self._read_fds.setdefault(segment_id, fd)
+            if cached_fd != fd:
+                os.close(fd)
+                fd = cached_fd
+        return fd
+
+    def _append(self, key_bytes: bytes, length: int, payload: bytes = b"") -> tuple[int, int]:
+        """Appends one record and returns the (segment, offset) of its payload."""
+        fd = self._get_append_fd()
+        segment_id = self._segment_id
+        # One write per record; the loop only guards against short writes, which would misplace later offsets
+        view = memoryview(_RECORD_HEADER.pack(len(key_bytes), length) + key_bytes + payload)
+        try:
+            while view:
+                view = view[os.write(fd, view):]
+        except OSError:
+            # Drop the partial record so later records (and replay) start at the expected offset
+            os.ftruncate(fd, self._segment_offset)
+            raise
+        payload_offset = self._segment_offset + _RECORD_HEADER.size + len(key_bytes)
+        self._segment_offset = payload_offset + len(payload)
+        if self._segment_offset >= self.segment_size:
+            # Roll over to a new segment on the next append
+            os.close(self._append_fd)
+            self._append_fd = None
+        return segment_id, payload_offset
+
+    def _count_write(self):
+        self._unsaved_writes += 1
+        if self._unsaved_writes >= self.index_flush_interval:
+            self.flush()
+
+    def put(self, key: str, payload: bytes):
+        """Stores payload under key, replacing any previous value."""
+        segment_id, offset = self._append(key.encode('utf-8'), len(payload), payload)
+        self._index[key] = (segment_id, offset, len(payload))
+        self._count_write()
+
+    def get(self, key: str) -> bytes | None:
+        """Returns the payload stored under key, or None if there is none."""
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        segment_id, offset, length = entry
+        return os.pread(self._get_read_fd(segment_id), length, offset)
+
+    def delete(self, key: str) -> bool:
+        """Deletes key. Returns False if it was not present."""
+        if key not in self._index:
+            return False
+        self._append(key.encode('utf-8'), _TOMBSTONE)
+        del self._index[key]
+        self._count_write()
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def flush(self):
+        """Saves the index, atomically replacing index.json."""
+        if not self._unsaved_writes:
+            return
+        saved = {"position": (self._segment_id, self._segment_offset), "entries": self._index}
+        data = json_io.dumps(saved)
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, index_path)
+        self._unsaved_writes = 0
+
+    def close(self):
+        """Saves the index and closes all descriptors. The log reopens them on next use."""
+        self.flush()
+        if self._append_fd is not None:
+            os.close(self._append_fd)
+            self._append_fd = None
+        for fd in self._read_fds.values():
+            os.close(fd)
+        self._read_fds.clear()
+
+# Self-test (for testing purposes); run from the repository root with `python -m virem_vault.segment_log`
+if __name__ == "__main__":
+    import tempfile
+
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    with tempfile.TemporaryDirectory() as directory:
+        print("\n--- put/get/delete ---")
+        log = SegmentLog(directory, segment_size=256)
+        log.put("alpha", b"first")
+        log.put("beta", b"second")
+        log.put("alpha", b"first, rewritten")
+        assert log.get("alpha") == b"first, rewritten" and log.get("beta") == b"second"
+        assert log.delete("beta") and not log.delete("beta") and log.get("beta") is None
+        print("put/get/delete verified:", len(log), "key(s)")
+
+        print("\n--- segment rollover ---")
+        for i in range(20):
+            log.put(f"key_{i}", bytes([i]) * 40)
+        segments = sorted(name for name in os.listdir(directory) if name.endswith(".log"))
+        assert len(segments) > 1
+        assert all(log.get(f"key_{i}") == bytes([i]) * 40 for i in range(20))
+        print("Rollover verified:", len(segments), "segments")
+
+        print("\n--- reopen and replay ---")
+        log.flush()
+        log.put("gamma", b"written after the last index save")
+        log.delete("key_0")
+        log.close() # Saves the index again; remove it to exercise a full replay
+        os.remove(os.path.join(directory, INDEX_FILE))
+        log = SegmentLog(directory, segment_size=256)
+        assert log.get("gamma") == b"written after the last index save" and "key_0" not in log
+        assert log.get("alpha") == b"first, rewritten" and log.get("key_19") == bytes([19]) * 40
+        print("Replay verified:", len(log), "key(s)")
+
+        print("\n--- torn trailing record ---")
+        log.close()
+        last_segment = log._segment_path(log._segment_id)
+        with open(last_segment, "ab") as f:
+            f.write(_RECORD_HEADER.pack(5, 100) + b"delta" + b"partial")
+        log = SegmentLog(directory, segment_size=256)
+        assert "delta" not in log and log.get("gamma") == b"written after the last index save"
+        log.put("delta", b"after the torn record")
+        log.close()
+        log = SegmentLog(directory, segment_size=256)
+        assert log.get("delta") == b"after the torn record"
+        log.close()
+        print("Torn record recovery verified.")